@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from comfy_api.latest import ComfyExtension, io
 
+from .comfy_canvas_routes import notify_result_updated
 from .comfy_canvas_session import (
-    blank_document,
+    blank_document_tensors,
     normalize_session_id,
     pil_to_image_tensor,
     pil_to_mask_tensor,
@@ -15,7 +16,7 @@ from .comfy_canvas_session import (
     seed_session_from_tensor,
     session_signature,
     tensor_signature,
-    tensor_to_pil_image,
+    tensor_to_image_and_mask,
 )
 
 
@@ -63,19 +64,16 @@ class ComfyCanvasNode(io.ComfyNode):
         prompt_text = read_session_prompt(resolved_session_id) if resolved_session_id else ""
 
         if edited is not None:
-            result_image = edited
-            result_mask = read_session_mask(resolved_session_id)
+            edited_mask = read_session_mask(resolved_session_id)
+            image_tensor = pil_to_image_tensor(edited)
+            mask_tensor = pil_to_mask_tensor(edited_mask or edited, edited.size)
         elif image is not None:
             if resolved_session_id:
                 seed_session_from_tensor(resolved_session_id, image)
-            result_image = tensor_to_pil_image(image)
-            result_mask = None
+            image_tensor, mask_tensor = tensor_to_image_and_mask(image)
         else:
-            result_image = blank_document(canvas_width, canvas_height, background)
-            result_mask = None
+            image_tensor, mask_tensor = blank_document_tensors(canvas_width, canvas_height, background)
 
-        image_tensor = pil_to_image_tensor(result_image)
-        mask_tensor = pil_to_mask_tensor(result_mask or result_image, result_image.size)
         return io.NodeOutput(image_tensor, mask_tensor, resolved_session_id, prompt_text)
 
 
@@ -110,6 +108,7 @@ class ComfyCanvasOutputNode(io.ComfyNode):
         resolved_session_id = _resolve_session_id(session_id) if session_id else ""
         if resolved_session_id:
             save_result_tensor(resolved_session_id, image)
+            notify_result_updated(resolved_session_id)
         return io.NodeOutput(image)
 
 
@@ -1,3 +1,11 @@
+import asyncio
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .comfy_canvas_session import (
     clear_session,
     get_session_state,
@@ -8,6 +16,13 @@ from .comfy_canvas_session import (
 
 _ROUTES_REGISTERED = False
 SESSION_ROUTE = "/comfy_canvas/sessions"
+RESULT_EVENT = "comfy_canvas.result_updated"
+
+
+def _json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def _session_response(session_id: str) -> dict:
@@ -43,6 +58,19 @@ def _session_response(session_id: str) -> dict:
     }
 
 
+def notify_result_updated(session_id: str) -> None:
+    try:
+        from server import PromptServer
+    except ImportError:
+        return
+
+    prompt_server = getattr(PromptServer, "instance", None)
+    if prompt_server is None:
+        return
+
+    prompt_server.send_sync(RESULT_EVENT, {"session_id": normalize_session_id(session_id)})
+
+
 def register_routes() -> None:
     global _ROUTES_REGISTERED
     if _ROUTES_REGISTERED:
@@ -56,54 +84,60 @@ def register_routes() -> None:
 
     from aiohttp import web
 
+    def json_response(data):
+        if orjson is not None:
+            return web.Response(body=orjson.dumps(data), content_type="application/json")
+        return web.json_response(data)
+
     routes = prompt_server.routes
 
     async def get_session(request):
         session_id = request.match_info["session_id"]
-        return web.json_response(_session_response(session_id))
+        return json_response(await asyncio.to_thread(_session_response, session_id))
 
     async def save_session(request):
         session_id = request.match_info["session_id"]
-        payload = await request.json()
-        metadata = save_session_payload(
+        payload = _json_loads(await request.read())
+        metadata = await asyncio.to_thread(
+            save_session_payload,
             session_id=session_id,
             image_data_url=payload["image"],
             mask_data_url=payload.get("mask"),
             metadata=payload.get("metadata"),
             document=payload.get("document"),
         )
-        response = _session_response(session_id)
+        response = await asyncio.to_thread(_session_response, session_id)
         response["metadata"] = metadata
-        return web.json_response(response)
+        return json_response(response)
 
     async def clear_session_handler(request):
         session_id = request.match_info["session_id"]
-        clear_session(session_id)
-        return web.json_response({"ok": True, "session_id": normalize_session_id(session_id)})
+        await asyncio.to_thread(clear_session, session_id)
+        return json_response({"ok": True, "session_id": normalize_session_id(session_id)})
 
     async def get_session_image(request):
-        state = get_session_state(request.match_info["session_id"])
+        state = get_session_state(request.match_info["session_id"], include_metadata=False)
         if state["preview_path"] is None or not state["preview_path"].exists():
             raise web.HTTPNotFound()
         return web.FileResponse(state["preview_path"])
 
     async def get_session_mask(request):
-        state = get_session_state(request.match_info["session_id"])
+        state = get_session_state(request.match_info["session_id"], include_metadata=False)
         if not state["mask_exists"]:
             raise web.HTTPNotFound()
         return web.FileResponse(state["mask_path"])
 
     async def get_session_result(request):
-        state = get_session_state(request.match_info["session_id"])
+        state = get_session_state(request.match_info["session_id"], include_metadata=False)
         if not state["result_exists"]:
             raise web.HTTPNotFound()
         return web.FileResponse(state["result_path"])
 
     async def get_session_document(request):
-        document = read_session_document(request.match_info["session_id"])
+        document = await asyncio.to_thread(read_session_document, request.match_info["session_id"])
         if document is None:
             raise web.HTTPNotFound()
-        return web.json_response(document)
+        return json_response(document)
 
     routes.get(f"{SESSION_ROUTE}/{{session_id}}")(get_session)
     routes.post(f"{SESSION_ROUTE}/{{session_id}}")(save_session)
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
-import base64
+import contextlib
 import hashlib
 import io
 import json
+import mmap
+import os
 import re
 import shutil
 import threading
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional, Tuple
 
+try:
+    from pybase64 import b64decode, b64encode
+except ImportError:
+    from base64 import b64decode, b64encode
+
 if TYPE_CHECKING:
     import torch
     from PIL import Image
@@ -20,14 +29,29 @@ LEGACY_SESSION_ROOT = PACKAGE_ROOT / "data" / "sessions"
 _SESSION_ROOT: Optional[Path] = None
 
 _LOCK = threading.RLock()
+_REPLACE_ATTEMPTS = 5
+_REPLACE_RETRY_DELAY = 0.05
+
+
+def _read_png_compress_level() -> int:
+    try:
+        level = int(os.environ.get("COMFY_CANVAS_PNG_COMPRESS_LEVEL", "1"))
+    except ValueError:
+        return 1
+    return max(0, min(9, level))
+
 
+PNG_COMPRESS_LEVEL = _read_png_compress_level()
 
+
+@lru_cache(maxsize=None)
 def _get_pil_image():
     from PIL import Image
 
     return Image
 
 
+@lru_cache(maxsize=None)
 def _get_array_runtime():
     import numpy as np
     import torch
@@ -48,16 +72,20 @@ def _get_session_root() -> Path:
     if _SESSION_ROOT is not None:
         return _SESSION_ROOT
 
-    try:
-        import folder_paths
+    with _LOCK:
+        if _SESSION_ROOT is not None:
+            return _SESSION_ROOT
 
-        root = Path(folder_paths.get_system_user_directory("comfy_canvas")) / "sessions"
-    except Exception:
-        root = Path.home() / ".comfy_canvas" / "sessions"
+        try:
+            import folder_paths
 
-    root.mkdir(parents=True, exist_ok=True)
-    _SESSION_ROOT = root
-    return root
+            root = Path(folder_paths.get_system_user_directory("comfy_canvas")) / "sessions"
+        except Exception:
+            root = Path.home() / ".comfy_canvas" / "sessions"
+
+        root.mkdir(parents=True, exist_ok=True)
+        _SESSION_ROOT = root
+        return root
 
 
 def _migrate_legacy_session_dir(normalized_session_id: str, session_dir: Path) -> None:
@@ -72,6 +100,7 @@ def _migrate_legacy_session_dir(normalized_session_id: str, session_dir: Path) -
         shutil.move(str(legacy_dir), str(session_dir))
 
 
+@lru_cache(maxsize=256)
 def get_session_dir(session_id: str) -> Path:
     normalized = normalize_session_id(session_id)
     session_dir = _get_session_root() / normalized
@@ -108,14 +137,99 @@ def _document_layers_dir(session_id: str) -> Path:
 
 
 def _decode_data_url(data_url: str) -> bytes:
-    if not data_url or "," not in data_url:
+    separator = data_url.find(",") if data_url else -1
+    if separator < 0:
         raise ValueError("invalid data URL")
-    _, payload = data_url.split(",", 1)
-    return base64.b64decode(payload)
+    return b64decode(data_url[separator + 1 :])
+
+
+def _ensure_mode(image: "Image.Image", mode: str) -> "Image.Image":
+    return image if image.mode == mode else image.convert(mode)
+
+
+def _open_image(path: Path, mode: str) -> "Image.Image":
+    Image = _get_pil_image()
+    image = Image.open(path)
+    image.load()
+    return _ensure_mode(image, mode)
+
+
+def _atomic_tmp_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.tmp")
+
+
+def _discard_tmp(tmp_path: Path) -> None:
+    with contextlib.suppress(OSError):
+        tmp_path.unlink(missing_ok=True)
+
+
+def _replace_atomic(path: Path, write) -> None:
+    tmp_path = _atomic_tmp_path(path)
+    try:
+        write(tmp_path)
+    except BaseException:
+        _discard_tmp(tmp_path)
+        raise
+
+    try:
+        os.replace(tmp_path, path)
+        return
+    except PermissionError:
+        if os.name != "nt":
+            _discard_tmp(tmp_path)
+            raise
+    except BaseException:
+        _discard_tmp(tmp_path)
+        raise
+
+    # Windows refuses the rename while the target is open elsewhere; retry, then overwrite it in place.
+    try:
+        for _attempt in range(_REPLACE_ATTEMPTS):
+            time.sleep(_REPLACE_RETRY_DELAY)
+            try:
+                os.replace(tmp_path, path)
+                return
+            except PermissionError:
+                pass
+        shutil.copyfile(tmp_path, path)
+    finally:
+        _discard_tmp(tmp_path)
+
+
+def _save_png_atomic(image: "Image.Image", path: Path) -> None:
+    _replace_atomic(path, lambda tmp_path: image.save(tmp_path, format="PNG", compress_level=PNG_COMPRESS_LEVEL))
+
+
+def _write_bytes_atomic(data: bytes, path: Path) -> None:
+    _replace_atomic(path, lambda tmp_path: tmp_path.write_bytes(data))
+
+
+def _prepare_data_url_png(data_url: str, mode: str):
+    Image = _get_pil_image()
+    raw = _decode_data_url(data_url)
+    with Image.open(io.BytesIO(raw)) as image:
+        image.load()
+        if image.format == "PNG" and image.mode == mode:
+            return raw, image.size
+        converted = _ensure_mode(image, mode)
+    return converted, converted.size
+
+
+def _write_prepared_png(prepared, path: Path) -> None:
+    if isinstance(prepared, bytes):
+        _write_bytes_atomic(prepared, path)
+    else:
+        _save_png_atomic(prepared, path)
+
+
+def _save_data_url_png(data_url: str, path: Path, mode: str) -> Tuple[int, int]:
+    prepared, size = _prepare_data_url_png(data_url, mode)
+    _write_prepared_png(prepared, path)
+    return size
 
 
 def _write_metadata(path: Path, metadata: dict) -> None:
-    path.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    _write_bytes_atomic(json.dumps(metadata, indent=2).encode("utf-8"), path)
 
 
 def _read_metadata(path: Path) -> dict:
@@ -142,12 +256,15 @@ def _safe_int(value, default: int = 0) -> int:
 
 
 def _encode_file_data_url(path: Path, mime_type: str = "image/png") -> str:
-    payload = base64.b64encode(path.read_bytes()).decode("ascii")
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return f"data:{mime_type};base64,"
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            payload = b64encode(mapped).decode("ascii")
     return f"data:{mime_type};base64,{payload}"
 
 
 def _save_document_payload(session_id: str, document: dict) -> dict:
-    Image = _get_pil_image()
     if not isinstance(document, dict):
         raise ValueError("invalid document payload")
 
@@ -185,16 +302,14 @@ def _save_document_payload(session_id: str, document: dict) -> dict:
         if not image_data_url:
             raise ValueError(f"document layer {index} is missing imageDataUrl")
 
-        image = Image.open(io.BytesIO(_decode_data_url(image_data_url))).convert("RGBA")
         layer_filename = f"layer_{index:04d}.png"
-        image.save(layers_dir / layer_filename)
+        _save_data_url_png(image_data_url, layers_dir / layer_filename, "RGBA")
 
         mask_filename = None
         mask_data_url = layer.get("maskImageDataUrl")
         if mask_data_url:
-            mask = Image.open(io.BytesIO(_decode_data_url(mask_data_url))).convert("RGBA")
             mask_filename = f"layer_mask_{index:04d}.png"
-            mask.save(layers_dir / mask_filename)
+            _save_data_url_png(mask_data_url, layers_dir / mask_filename, "RGBA")
 
         manifest["layers"].append(
             {
@@ -218,6 +333,11 @@ def _save_document_payload(session_id: str, document: dict) -> dict:
 
 def read_session_document(session_id: str) -> Optional[dict]:
     normalized = normalize_session_id(session_id)
+    with _LOCK:
+        return _read_session_document(normalized)
+
+
+def _read_session_document(normalized: str) -> Optional[dict]:
     manifest = _read_metadata(_document_path(normalized))
     if not manifest:
         return None
@@ -285,18 +405,22 @@ def read_session_prompt(session_id: str) -> str:
     return str(manifest.get("promptText") or "")
 
 
-def get_session_state(session_id: str) -> dict:
-    session_dir = get_session_dir(session_id)
-    edited_path = _edited_path(session_id)
-    seed_path = _seed_path(session_id)
-    mask_path = _mask_path(session_id)
-    result_path = _result_path(session_id)
-    metadata_path = _metadata_path(session_id)
-    document_path = _document_path(session_id)
-    document_layers_dir = _document_layers_dir(session_id)
-    preview_path = edited_path if edited_path.exists() else seed_path if seed_path.exists() else None
+def get_session_state(session_id: str, include_metadata: bool = True) -> dict:
+    normalized = normalize_session_id(session_id)
+    session_dir = get_session_dir(normalized)
+    edited_path = _edited_path(normalized)
+    seed_path = _seed_path(normalized)
+    mask_path = _mask_path(normalized)
+    result_path = _result_path(normalized)
+    metadata_path = _metadata_path(normalized)
+    document_path = _document_path(normalized)
+    document_layers_dir = _document_layers_dir(normalized)
+    edited_exists = edited_path.exists()
+    seed_exists = seed_path.exists()
+    document_exists = document_path.exists()
+    preview_path = edited_path if edited_exists else seed_path if seed_exists else None
     return {
-        "session_id": normalize_session_id(session_id),
+        "session_id": normalized,
         "session_dir": session_dir,
         "edited_path": edited_path,
         "seed_path": seed_path,
@@ -305,14 +429,14 @@ def get_session_state(session_id: str) -> dict:
         "metadata_path": metadata_path,
         "document_path": document_path,
         "document_layers_dir": document_layers_dir,
-        "metadata": _read_metadata(metadata_path),
-        "edited_exists": edited_path.exists(),
-        "seed_exists": seed_path.exists(),
+        "metadata": _read_metadata(metadata_path) if include_metadata else {},
+        "edited_exists": edited_exists,
+        "seed_exists": seed_exists,
         "mask_exists": mask_path.exists(),
         "result_exists": result_path.exists(),
-        "document_exists": document_path.exists(),
+        "document_exists": document_exists,
         "preview_path": preview_path,
-        "exists": preview_path is not None or document_path.exists(),
+        "exists": preview_path is not None or document_exists,
     }
 
 
@@ -323,31 +447,28 @@ def save_session_payload(
     metadata: Optional[dict] = None,
     document: Optional[dict] = None,
 ) -> dict:
-    Image = _get_pil_image()
     normalized = normalize_session_id(session_id)
     session_dir = get_session_dir(normalized)
     session_dir.mkdir(parents=True, exist_ok=True)
 
-    image_bytes = _decode_data_url(image_data_url)
-    mask_bytes = _decode_data_url(mask_data_url) if mask_data_url else None
+    prepared_image, (width, height) = _prepare_data_url_png(image_data_url, "RGBA")
+    prepared_mask = _prepare_data_url_png(mask_data_url, "L")[0] if mask_data_url else None
 
     with _LOCK:
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGBA")
-        image.save(_edited_path(normalized))
+        _write_prepared_png(prepared_image, _edited_path(normalized))
 
         mask_path = _mask_path(normalized)
-        if mask_bytes is not None:
-            mask = Image.open(io.BytesIO(mask_bytes)).convert("L")
-            mask.save(mask_path)
+        if prepared_mask is not None:
+            _write_prepared_png(prepared_mask, mask_path)
         elif mask_path.exists():
             mask_path.unlink()
 
         payload = {
             "session_id": normalized,
             "updated_at": datetime.now(timezone.utc).isoformat(),
-            "width": image.width,
-            "height": image.height,
-            "has_mask": mask_bytes is not None,
+            "width": width,
+            "height": height,
+            "has_mask": prepared_mask is not None,
         }
         if metadata:
             payload.update(metadata)
@@ -368,30 +489,28 @@ def save_session_payload(
 
 
 def clear_session(session_id: str) -> None:
-    state = get_session_state(session_id)
+    state = get_session_state(session_id, include_metadata=False)
     with _LOCK:
         shutil.rmtree(state["session_dir"], ignore_errors=True)
 
 
 def read_session_image(session_id: str) -> Optional[Image.Image]:
-    Image = _get_pil_image()
-    state = get_session_state(session_id)
+    state = get_session_state(session_id, include_metadata=False)
     if not state["edited_exists"]:
         return None
-    return Image.open(state["edited_path"]).convert("RGBA")
+    return _open_image(state["edited_path"], "RGBA")
 
 
 def read_session_mask(session_id: str) -> Optional[Image.Image]:
-    Image = _get_pil_image()
-    state = get_session_state(session_id)
+    state = get_session_state(session_id, include_metadata=False)
     if not state["mask_exists"]:
         return None
-    return Image.open(state["mask_path"]).convert("L")
+    return _open_image(state["mask_path"], "L")
 
 
 def session_signature(session_id: str) -> str:
     try:
-        state = get_session_state(session_id)
+        state = get_session_state(session_id, include_metadata=False)
     except ValueError:
         return "missing"
 
@@ -406,7 +525,7 @@ def session_signature(session_id: str) -> str:
 
 def result_signature(session_id: str) -> str:
     try:
-        state = get_session_state(session_id)
+        state = get_session_state(session_id, include_metadata=False)
     except ValueError:
         return "missing"
 
@@ -422,51 +541,69 @@ def tensor_signature(image_tensor: Optional["torch.Tensor"]) -> str:
     if image_tensor is None:
         return "none"
 
-    image = tensor_to_pil_image(image_tensor).convert("RGB")
-    preview = image.resize((32, 32))
+    image = tensor_to_pil_image(image_tensor)
+    preview = image.resize((32, 32)).convert("RGB")
     digest = hashlib.sha1(preview.tobytes()).hexdigest()
     return f"{image.width}x{image.height}:{digest}"
 
 
 def tensor_to_pil_image(image_tensor: "torch.Tensor") -> "Image.Image":
-    np, _torch = _get_array_runtime()
+    _np, torch = _get_array_runtime()
     Image = _get_pil_image()
-    tensor = image_tensor.detach().cpu()
+    tensor = image_tensor.detach()
     if tensor.ndim == 4:
         tensor = tensor[0]
-    tensor = tensor.clamp(0, 1)
-    if tensor.shape[-1] == 1:
-        tensor = tensor.repeat(1, 1, 3)
-    image = (tensor.numpy() * 255.0).round().astype(np.uint8)
-    return Image.fromarray(image, mode="RGB").convert("RGBA")
+    pixels = tensor.mul(255.0).clamp_(0, 255).round_().to(torch.uint8)
+    if pixels.shape[-1] == 1:
+        pixels = pixels.expand(-1, -1, 3)
+    height, width = pixels.shape[0], pixels.shape[1]
+    rgba = torch.full((height, width, 4), 255, dtype=torch.uint8)
+    rgba[..., :3].copy_(pixels[..., :3])
+    # RGBA is one of PIL's mapped modes, so frombuffer shares this buffer instead of copying it.
+    return Image.frombuffer("RGBA", (width, height), rgba.numpy(), "raw", "RGBA", 0, 1)
 
 
-def pil_to_image_tensor(image: "Image.Image"):
+def _pil_to_unit_tensor(image: "Image.Image"):
     np, torch = _get_array_runtime()
-    rgb = np.asarray(image.convert("RGB"), dtype=np.float32) / 255.0
-    return torch.from_numpy(rgb)[None, ...]
+    pixels = np.array(image, dtype=np.uint8)
+    return torch.from_numpy(pixels).to(torch.float32).mul_(1.0 / 255.0)
+
+
+def pil_to_image_tensor(image: "Image.Image"):
+    return _pil_to_unit_tensor(_ensure_mode(image, "RGB")).unsqueeze(0)
 
 
 def pil_to_mask_tensor(image: Optional["Image.Image"], fallback_size: Tuple[int, int]):
-    np, torch = _get_array_runtime()
+    _np, torch = _get_array_runtime()
     if image is None:
         width, height = fallback_size
         return torch.zeros((height, width), dtype=torch.float32)
 
     if image.mode == "L":
-        mask = np.asarray(image, dtype=np.float32) / 255.0
-        return torch.from_numpy(mask)
+        return _pil_to_unit_tensor(image)
 
-    rgba = image.convert("RGBA")
-    alpha = np.asarray(rgba.getchannel("A"), dtype=np.float32) / 255.0
-    return torch.from_numpy(1.0 - alpha)
+    alpha = _pil_to_unit_tensor(_ensure_mode(image, "RGBA").getchannel("A"))
+    return alpha.neg_().add_(1.0)
 
 
-def blank_document(width: int, height: int, background: str) -> "Image.Image":
-    Image = _get_pil_image()
+def tensor_to_image_and_mask(image_tensor: "torch.Tensor"):
+    _np, torch = _get_array_runtime()
+    tensor = image_tensor.detach()
+    if tensor.ndim == 3:
+        tensor = tensor.unsqueeze(0)
+    tensor = tensor[:1]
+    if tensor.shape[-1] == 1:
+        tensor = tensor.repeat(1, 1, 1, 3)
+    image = tensor.to(device="cpu", dtype=torch.float32).clamp(0, 1)
+    mask = torch.zeros(image.shape[1:3], dtype=torch.float32)
+    return image, mask
+
+
+def blank_document_tensors(width: int, height: int, background: str):
+    _np, torch = _get_array_runtime()
     if background == "white":
-        return Image.new("RGBA", (width, height), (255, 255, 255, 255))
-    return Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        return torch.ones((1, height, width, 3), dtype=torch.float32), torch.zeros((height, width), dtype=torch.float32)
+    return torch.zeros((1, height, width, 3), dtype=torch.float32), torch.ones((height, width), dtype=torch.float32)
 
 
 def save_result_tensor(session_id: str, image_tensor: Optional["torch.Tensor"]) -> None:
@@ -479,7 +616,7 @@ def save_result_tensor(session_id: str, image_tensor: Optional["torch.Tensor"])
 
     image = tensor_to_pil_image(image_tensor)
     with _LOCK:
-        image.save(_result_path(normalized))
+        _save_png_atomic(image, _result_path(normalized))
         metadata = _read_metadata(_metadata_path(normalized))
         metadata.update(
             {
@@ -502,7 +639,7 @@ def seed_session_from_tensor(session_id: str, image_tensor: Optional["torch.Tens
 
     image = tensor_to_pil_image(image_tensor)
     with _LOCK:
-        image.save(_seed_path(normalized))
+        _save_png_atomic(image, _seed_path(normalized))
         metadata = _read_metadata(_metadata_path(normalized))
         metadata.update(
             {
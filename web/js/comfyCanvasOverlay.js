@@ -14,6 +14,8 @@ const RUN_REQUEST_MESSAGE_TYPE = "comfy-canvas:run-request";
 const RUN_RESULT_MESSAGE_TYPE = "comfy-canvas:run-result";
 const EDITOR_URL = new URL("../app/index.html", import.meta.url);
 const AUTOSAVE_DELAY_MS = 1000;
+const RESULT_EVENT_NAME = "comfy_canvas.result_updated";
+const RESULT_POLL_INTERVAL_MS = 5000;
 
 let modalState = null;
 let nodeStylesInjected = false;
@@ -871,7 +873,7 @@ function ensureModal() {
     }
   });
 
-  modalState = { backdrop, status, iframe, title, node: null, editorApi: null, sessionId: "", resultToken: "", pollTimer: null, pollInFlight: false, autoSaveTimer: null, changeUnsubscribe: null, dirty: false, changeToken: 0, savePromise: null, saveQueued: false, closing: false };
+  modalState = { backdrop, status, iframe, title, node: null, editorApi: null, sessionId: "", resolvedSessionId: "", resultToken: "", pollTimer: null, pollInFlight: false, pollQueued: false, autoSaveTimer: null, changeUnsubscribe: null, dirty: false, changeToken: 0, savePromise: null, saveQueued: false, closing: false };
   return modalState;
 }
 
@@ -884,6 +886,7 @@ function stopResultPolling() {
     modalState.pollTimer = null;
   }
   modalState.pollInFlight = false;
+  modalState.pollQueued = false;
 }
 
 function stopAutosave(modal = modalState) {
@@ -956,6 +959,7 @@ function finalizeCloseModal() {
   modalState.node = null;
   modalState.editorApi = null;
   modalState.sessionId = "";
+  modalState.resolvedSessionId = "";
   modalState.resultToken = "";
   modalState.dirty = false;
   modalState.changeToken = 0;
@@ -1114,8 +1118,12 @@ async function syncResultPreview(sessionInfo, size = null) {
 
 async function pollResultPreview() {
   const modal = ensureModal();
+  if (modal.pollInFlight) {
+    modal.pollQueued = true;
+    return;
+  }
+
   if (
-    modal.pollInFlight ||
     !modal.node ||
     !modal.sessionId ||
     !modal.backdrop.classList.contains("is-open")
@@ -1126,6 +1134,7 @@ async function pollResultPreview() {
   modal.pollInFlight = true;
   try {
     const sessionInfo = await fetchSession(modal.sessionId);
+    modal.resolvedSessionId = sessionInfo?.session_id || modal.resolvedSessionId;
     const nextToken = getResultToken(sessionInfo);
     if (nextToken === modal.resultToken) {
       return;
@@ -1137,6 +1146,10 @@ async function pollResultPreview() {
     console.warn("Failed to refresh AI output", error);
   } finally {
     modal.pollInFlight = false;
+    if (modal.pollQueued) {
+      modal.pollQueued = false;
+      pollResultPreview();
+    }
   }
 }
 
@@ -1149,7 +1162,15 @@ function startResultPolling() {
 
   modal.pollTimer = window.setInterval(() => {
     pollResultPreview();
-  }, 1000);
+  }, RESULT_POLL_INTERVAL_MS);
+}
+
+function handleResultUpdated(event) {
+  const sessionId = event?.detail?.session_id;
+  if (!modalState || !sessionId || sessionId !== (modalState.resolvedSessionId || modalState.sessionId)) {
+    return;
+  }
+  pollResultPreview();
 }
 async function primeEditor(node, sessionInfo) {
   const modal = ensureModal();
@@ -1324,6 +1345,7 @@ async function openEditor(node) {
   modal.node = node;
   modal.editorApi = null;
   modal.sessionId = sessionId;
+  modal.resolvedSessionId = "";
   modal.resultToken = "";
   modal.dirty = false;
   modal.changeToken = 0;
@@ -1340,6 +1362,7 @@ async function openEditor(node) {
   let sessionInfo = null;
   try {
     sessionInfo = await fetchSession(sessionId);
+    modal.resolvedSessionId = sessionInfo?.session_id || "";
   } catch (error) {
     console.warn("Failed to fetch session, falling back to preview image", error);
   }
@@ -1560,6 +1583,10 @@ function patchNodeType(nodeType) {
 
 app.registerExtension({
   name: EXTENSION_NAME,
+  setup() {
+    api.addEventListener(RESULT_EVENT_NAME, handleResultUpdated);
+  },
+
   async beforeRegisterNodeDef(nodeType, nodeData) {
     if (!TARGET_NODE_NAMES.has(nodeData?.name)) {
       return;